@@ -1,13 +1,25 @@
-from datetime import datetime, timedelta
-from typing import Dict
+from datetime import timedelta
+from typing import Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
-import requests
 
-API_URL = "http://127.0.0.1:8000/events?limit=100"
+from fim_core import (
+    EVENT_BUFFER_LIMIT,
+    EVENT_EMOJI,
+    HIGH_RISK_THRESHOLD,
+    RISK_LABELS,
+    SEVERITY_COLORS,
+    classify_risk_codes,
+    facet_options,
+    format_timestamp,
+    load_normalized_events,
+    mitre_badge,
+    severity_badge,
+)
 
 # =============================================================
 # Page config
@@ -20,73 +32,25 @@ st.set_page_config(
 
 st.title("🔐 File Integrity Monitoring Command Center")
 
+# Seconds between live refreshes of the KPI and live-feed fragments
+LIVE_REFRESH_SECONDS = 3
 
-# =============================================================
-# Auto-refresh (every 3 seconds)
-# =============================================================
-st_autorefresh(interval=3000, key="fim_refresh")
-
-
-def load_events_from_api() -> pd.DataFrame:
-    try:
-        resp = requests.get(API_URL, timeout=2)
-        resp.raise_for_status()
-        data = resp.json()
-        events = data.get("events", [])
-
-        if not events:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(events)
-
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-        if "process_name" in df.columns:
-            df = df.rename(columns={"process_name": "process"})
-        if "hash_before" in df.columns:
-            df = df.rename(columns={"hash_before": "old_hash"})
-        if "hash_after" in df.columns:
-            df = df.rename(columns={"hash_after": "new_hash"})
 
-        return df
-    except Exception as e:  # noqa: BLE001
-        st.error(f"API error: {e}")
-        return pd.DataFrame()
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def wait_for_events(has_matches) -> None:
+    """Keep polling while the page stops early, and rerun the app once there is something to show."""
+    live = load_normalized_events()
+    if not live.empty and has_matches(live):
+        st.rerun(scope="app")
 
 
-df = load_events_from_api()
+df = load_normalized_events()
 
 if df.empty:
     st.info("Hələ API-dən event gəlmir.")
+    wait_for_events(lambda live: True)
     st.stop()
 
-df = df.sort_values("timestamp", ascending=False).reset_index(drop=True)
-
-# Normalize expected columns and fallbacks
-defaults: Dict[str, str | int] = {
-    "event_type": "unknown",
-    "file_path": "(unknown)",
-    "mitre_technique": "unknown",
-    "user": "unknown",
-    "process": "unknown",
-    "host": "unknown",
-    "site": "unknown",
-    "reason": "No description provided.",
-    "old_hash": "-",
-    "new_hash": "-",
-}
-
-for col, default in defaults.items():
-    if col not in df.columns:
-        df[col] = default
-    else:
-        df[col] = df[col].fillna(default)
-
-df["ai_risk_score"] = pd.to_numeric(df.get("ai_risk_score", 0), errors="coerce").fillna(0).astype(int)
-
-if "event_id" not in df.columns:
-    df["event_id"] = [f"evt-{i:05d}" for i in range(len(df))]
-
 # =============================================================
 # Sidebar filters
 # =============================================================
@@ -107,11 +71,14 @@ else:
         step=timedelta(minutes=5),
     )
 
-event_types = sorted(df["event_type"].dropna().unique().tolist())
-mitre_options = sorted(df["mitre_technique"].dropna().unique().tolist())
-users = sorted(df["user"].dropna().unique().tolist())
-processes = sorted(df["process"].dropna().unique().tolist())
-hosts = sorted(df["host"].dropna().unique().tolist())
+# Data version: the buffer only changes by appending newer events
+data_sig = (len(df), int(max_ts.value))
+facets = facet_options(data_sig, df)
+event_types = facets["event_type"]
+mitre_options = facets["mitre_technique"]
+users = facets["user"]
+processes = facets["process"]
+hosts = facets["host"]
 
 mitre_filter = st.sidebar.multiselect(
     "MITRE techniques",
@@ -142,77 +109,243 @@ min_risk = st.sidebar.slider(
     step=5,
 )
 
-# Apply time window
 start_ts, end_ts = time_range
-df = df[(df["timestamp"] >= start_ts) & (df["timestamp"] <= end_ts)]
-
-# Apply filters
-df = df[
-    (df["event_type"].isin(event_type_filter))
-    & (df["ai_risk_score"] >= min_risk)
-    & (df["mitre_technique"].isin(mitre_filter))
-    & (df["user"].isin(user_filter))
-    & (df["process"].isin(process_filter))
-    & (df["host"].isin(host_filter))
-]
+# A window pinned to the newest event stays open-ended so live refreshes keep new arrivals
+end_open = end_ts >= max_ts
+# Likewise a window starting at the oldest buffered event filters nothing on that side
+start_open = start_ts <= min_ts
+# Range checks run on the raw int64 nanoseconds rather than boxed Timestamps
+start_ns = pd.Timestamp(start_ts).value
+end_ns = pd.Timestamp(end_ts).value
+
+
+def _category_mask(series: pd.Series, selection: list) -> np.ndarray:
+    allowed = series.cat.categories.get_indexer(selection)
+    return np.isin(series.cat.codes.to_numpy(), allowed[allowed >= 0])
+
+
+def apply_filters(df: pd.DataFrame) -> pd.DataFrame:
+    ts_ns = df["timestamp"].values.view("i8")
+    masks = []
+    if not start_open:
+        masks.append(ts_ns >= start_ns)
+    if min_risk > 0:
+        masks.append(df["ai_risk_score"].to_numpy() >= min_risk)
+    for col, selection, options in (
+        ("event_type", event_type_filter, event_types),
+        ("mitre_technique", mitre_filter, mitre_options),
+        ("user", user_filter, users),
+        ("process", process_filter, processes),
+        ("host", host_filter, hosts),
+    ):
+        # Everything selected (the default) makes the predicate a no-op
+        if len(selection) != len(options):
+            masks.append(_category_mask(df[col], selection))
+    if not end_open:
+        masks.append(ts_ns <= end_ns)
+    if not masks:
+        return df
+    return df[np.logical_and.reduce(masks)]
+
+
+def load_live_events() -> pd.DataFrame:
+    """Re-fetch and re-filter events for a live fragment rerun."""
+    live = load_normalized_events()
+    # No new events since the full run: its filtered view is still current
+    if live is events:
+        return df
+    if live.empty:
+        return live
+    return apply_filters(live)
+
+
+events = df
+df = apply_filters(events)
 
 if df.empty:
     st.info("No events match the current filters.")
+    wait_for_events(lambda live: not apply_filters(live).empty)
     st.stop()
 
 # =============================================================
-# Helper utilities
+# Cached aggregations
 # =============================================================
-SEVERITY_COLORS = {
-    "high": "#f77f00",
-    "medium": "#ffd166",
-    "low": "#4cc9f0",
-}
+# Cheap fingerprint of the filtered view. The aggregations below take the frame
+# as an underscore-prefixed argument so Streamlit keys them on the fingerprint
+# only and never hashes the DataFrame contents.
+view_sig = (
+    len(df),
+    int(df["timestamp"].max().value),
+    time_range,
+    tuple(event_type_filter),
+    tuple(mitre_filter),
+    tuple(user_filter),
+    tuple(process_filter),
+    tuple(host_filter),
+    min_risk,
+)
+
+
+RISK_HISTOGRAM_BINS = 15
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _risk_profile(sig: tuple, _df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (event volume by type, binned risk histogram) for the current view.
 
+    The histogram is binned here so the browser receives a score-bin x severity
+    grid rather than every raw score and severity label.
+    """
+    event_type = _df["event_type"].cat
+    scores = _df["ai_risk_score"].to_numpy()
+    severity = classify_risk_codes(scores)
+    counts = np.bincount(event_type.codes.to_numpy(), minlength=len(event_type.categories))
+    observed = counts > 0
+    by_type = pd.DataFrame({"event_type": event_type.categories[observed], "count": counts[observed]})
 
-def classify_risk(score: int) -> str:
-    if score >= 70:
-        return "high"
-    if score >= 40:
-        return "medium"
-    return "low"
+    n_levels = len(RISK_LABELS)
+    grid, edges, _ = np.histogram2d(
+        scores,
+        severity,
+        bins=(RISK_HISTOGRAM_BINS, n_levels),
+        range=((0, 100), (0, n_levels)),
+    )
+    hist = pd.DataFrame(
+        {
+            "ai_risk_score": np.repeat((edges[:-1] + edges[1:]) / 2, n_levels),
+            "severity": np.tile(RISK_LABELS, RISK_HISTOGRAM_BINS),
+            "count": grid.ravel().astype(int),
+        }
+    )
+    return by_type, hist[hist["count"] > 0]
+
+
+NS_PER_MINUTE = 60_000_000_000
 
 
-def severity_badge(score: int) -> str:
-    level = classify_risk(score)
-    color = SEVERITY_COLORS[level]
-    return f"<span style='color:{color}; font-weight:600;'>{level.upper()}</span>"
+@st.cache_data(max_entries=32, show_spinner=False)
+def _timeline(sig: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    # Floor to the minute and count on the int64 nanoseconds; no groupby hash table needed
+    ts = _df["timestamp"]
+    ns = ts.values.view("i8")
+    minutes, counts = np.unique(ns - ns % NS_PER_MINUTE, return_counts=True)
+    return pd.DataFrame({"minute": pd.DatetimeIndex(minutes, dtype=ts.dtype), "count": counts})
 
 
-def mitre_badge(technique: str) -> str:
-    return f"<span style='background:#111827;color:white;padding:2px 6px;border-radius:6px;font-size:12px;'>MITRE {technique}</span>"
+@st.cache_data(max_entries=32, show_spinner=False)
+def _hash_views(sig: tuple, _df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (transition counts, hash change table) for rows carrying hash data."""
+    hash_df = _df[_df["has_hash"].to_numpy()]
+
+    transition_counts = (
+        hash_df.value_counts(["old_hash", "new_hash"], sort=False).reset_index(name="count")
+    )
+
+    hash_table = (
+        hash_df[["timestamp", "file_path", "old_hash", "new_hash", "ai_risk_score", "event_id"]]
+        .sort_values("timestamp", ascending=False)
+    )
+    hash_table = hash_table.assign(timestamp=hash_table["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S"))
+    return transition_counts, hash_table
+
+
+SEVERITY_DISPLAY = np.char.upper(RISK_LABELS)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _events_table(sig: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    """Display-ready projection of the filtered events for the main table."""
+    # Only the derived columns are built; the rest are taken straight from the filtered view
+    return _df[["event_id", "event_type", "file_path", "ai_risk_score", "user", "process", "host", "site"]].assign(
+        timestamp=_df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+        severity=SEVERITY_DISPLAY[classify_risk_codes(_df["ai_risk_score"].to_numpy())],
+        mitre=_df["mitre_technique"],
+    )[
+        [
+            "timestamp",
+            "event_id",
+            "event_type",
+            "file_path",
+            "ai_risk_score",
+            "severity",
+            "mitre",
+            "user",
+            "process",
+            "host",
+            "site",
+        ]
+    ]
 
 
-def format_timestamp(ts: datetime) -> str:
-    return ts.strftime("%Y-%m-%d %H:%M:%S")
+# Plotly figure construction (trace validation, layout defaults) costs more than
+# the aggregations feeding it, so the finished figures are cached on the view too
+@st.cache_data(max_entries=32, show_spinner=False)
+def _risk_figure(sig: tuple, _risk_hist: pd.DataFrame) -> go.Figure:
+    fig = px.bar(
+        _risk_hist,
+        x="ai_risk_score",
+        y="count",
+        color="severity",
+        height=300,
+    )
+    fig.update_traces(width=100 / RISK_HISTOGRAM_BINS)
+    fig.update_layout(bargap=0)
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _hash_figure(sig: tuple, _transition_counts: pd.DataFrame) -> go.Figure:
+    fig = px.density_heatmap(
+        _transition_counts,
+        x="old_hash",
+        y="new_hash",
+        z="count",
+        color_continuous_scale="Blues",
+        height=380,
+        text_auto=True,
+    )
+    fig.update_layout(xaxis_title="Before hash", yaxis_title="After hash")
+    return fig
 
 
 # =============================================================
 # KPI metrics
 # =============================================================
-col1, col2, col3, col4, col5 = st.columns(5)
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def kpi_panel() -> None:
+    live = load_live_events()
+    if live.empty:
+        st.info("No events match the current filters.")
+        return
+
+    # All five figures come from column arrays: a count on the int8 scores, occupied
+    # codes for the host categorical, and the head row of the newest-first buffer
+    total = len(live)
+    high_risk_count = int(np.count_nonzero(live["ai_risk_score"].to_numpy() >= HIGH_RISK_THRESHOLD))
+    files_touched = live["file_path"].nunique()
+    host_codes = live["host"].cat.codes.to_numpy()
+    hosts_involved = int(np.count_nonzero(np.bincount(host_codes, minlength=len(live["host"].cat.categories))))
+    last_event_time = live["timestamp"].iat[0].strftime("%H:%M:%S")
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    with col1:
+        st.metric("Total events (filtered)", total)
 
-with col1:
-    st.metric("Total events (filtered)", len(df))
+    with col2:
+        st.metric(f"High-risk (≥{HIGH_RISK_THRESHOLD})", high_risk_count)
 
-with col2:
-    high_risk_count = (df["ai_risk_score"] >= 80).sum()
-    st.metric("High-risk (≥80)", int(high_risk_count))
+    with col3:
+        st.metric("Unique files touched", files_touched)
 
-with col3:
-    st.metric("Unique files touched", df["file_path"].nunique())
+    with col4:
+        st.metric("Hosts involved", hosts_involved)
 
-with col4:
-    st.metric("Hosts involved", df["host"].nunique())
+    with col5:
+        st.metric("Last event time", last_event_time)
 
-with col5:
-    last_event_time = df["timestamp"].max().strftime("%H:%M:%S")
-    st.metric("Last event time", last_event_time)
+
+kpi_panel()
 
 # =============================================================
 # Charts
@@ -221,33 +354,17 @@ chart_col1, chart_col2, chart_col3 = st.columns(3)
 
 with chart_col1:
     st.subheader("Event volume by type")
-    by_type = df.groupby("event_type").size().reset_index(name="count")
-    fig_type = px.bar(by_type, x="event_type", y="count", color="event_type", height=300)
-    st.plotly_chart(fig_type, use_container_width=True)
+    by_type, risk_hist = _risk_profile(view_sig, df)
+    st.bar_chart(by_type, x="event_type", y="count", color="event_type", height=300)
 
 with chart_col2:
     st.subheader("Risk score distribution")
-    fig_risk = px.histogram(
-        df,
-        x="ai_risk_score",
-        nbins=15,
-        color=df["ai_risk_score"].apply(classify_risk),
-        height=300,
-        labels={"color": "severity"},
-    )
-    st.plotly_chart(fig_risk, use_container_width=True)
+    st.plotly_chart(_risk_figure(view_sig, risk_hist), use_container_width=True, key="risk_histogram")
 
 with chart_col3:
     st.subheader("Events over time (minute)")
-    timeline = (
-        df.copy()
-        .assign(minute=df["timestamp"].dt.floor("T"))
-        .groupby("minute")
-        .size()
-        .reset_index(name="count")
-    )
-    fig_time = px.line(timeline, x="minute", y="count", markers=True, height=300)
-    st.plotly_chart(fig_time, use_container_width=True)
+    timeline = _timeline(view_sig, df)
+    st.line_chart(timeline, x="minute", y="count", height=300)
 
 # =============================================================
 # Hash change analytics
@@ -257,38 +374,22 @@ hash_section = st.container()
 with hash_section:
     st.subheader("🔁 File hash transitions")
 
-    hash_df = df[(df["old_hash"] != "-") | (df["new_hash"] != "-")].copy()
+    transition_counts, hash_table = _hash_views(view_sig, df)
 
-    if hash_df.empty:
+    if hash_table.empty:
         st.info("No hash data available for the current filters.")
     else:
         chart_col_a, chart_col_b = st.columns([1.1, 1.9])
 
         with chart_col_a:
-            transition_counts = (
-                hash_df.groupby(["old_hash", "new_hash"]).size().reset_index(name="count")
-            )
-
-            fig_hash = px.density_heatmap(
-                transition_counts,
-                x="old_hash",
-                y="new_hash",
-                z="count",
-                color_continuous_scale="Blues",
-                height=380,
-                text_auto=True,
+            st.plotly_chart(
+                _hash_figure(view_sig, transition_counts),
+                use_container_width=True,
+                key="hash_heatmap",
             )
-            fig_hash.update_layout(xaxis_title="Before hash", yaxis_title="After hash")
-            st.plotly_chart(fig_hash, use_container_width=True)
 
         with chart_col_b:
             st.markdown("**Hash change table**")
-            hash_table = (
-                hash_df[["timestamp", "file_path", "old_hash", "new_hash", "ai_risk_score", "event_id"]]
-                .sort_values("timestamp", ascending=False)
-            )
-            hash_table["timestamp"] = hash_table["timestamp"].apply(format_timestamp)
-
             st.dataframe(
                 hash_table.rename(
                     columns={
@@ -312,31 +413,12 @@ table_col, detail_col, timeline_col = st.columns([2.6, 1.6, 1.4])
 with table_col:
     st.subheader("📄 Events table")
 
-    df_display = df.copy()
-    df_display["timestamp"] = df_display["timestamp"].apply(format_timestamp)
-    df_display["severity"] = df_display["ai_risk_score"].apply(classify_risk).str.upper()
-    df_display["mitre"] = df_display["mitre_technique"]
-
     st.dataframe(
-        df_display[
-            [
-                "timestamp",
-                "event_id",
-                "event_type",
-                "file_path",
-                "ai_risk_score",
-                "severity",
-                "mitre",
-                "user",
-                "process",
-                "host",
-                "site",
-            ]
-        ]
-        .style.format({"ai_risk_score": "{:.0f}"})
-        .hide(axis="index"),
+        _events_table(view_sig, df),
         use_container_width=True,
         height=520,
+        hide_index=True,
+        column_config={"ai_risk_score": st.column_config.NumberColumn(format="%d")},
     )
 
 with detail_col:
@@ -372,26 +454,43 @@ with detail_col:
         "- Escalate to IR on repeated unauthorized modifications"
     )
 
-with timeline_col:
+# Severity colour per RISK_LABELS index, so the feed picks colours by code
+RISK_COLORS = np.array([SEVERITY_COLORS[level] for level in RISK_LABELS])
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_feed() -> None:
     st.subheader("🕒 Live feed (last 12)")
-    timeline_df = df.sort_values("timestamp", ascending=True).tail(12)
-
-    for _, row in timeline_df.iterrows():
-        ts = row["timestamp"].strftime("%H:%M:%S")
-        etype = row["event_type"]
-        fpath = row["file_path"]
-        score = row["ai_risk_score"]
-        level = classify_risk(score)
-        emoji = {
-            "create": "🟩",
-            "modify": "🟨",
-            "delete": "🟥",
-        }.get(etype, "⬜")
-        st.markdown(
-            f"**{ts}** — {emoji} `{etype}` on `{fpath}` | "
-            f"Risk: <span style='color:{SEVERITY_COLORS[level]};'>{score}</span>"
-            f" | {mitre_badge(row['mitre_technique'])}",
-            unsafe_allow_html=True,
-        )
-
-st.caption("Data is pulled from the live /events API endpoint (limit=100).")
+    live = load_live_events()
+    if live.empty:
+        st.info("No events match the current filters.")
+        return
+
+    timeline_df = live.head(12).iloc[::-1]
+    timeline_df = timeline_df.assign(
+        ts=timeline_df["timestamp"].dt.strftime("%H:%M:%S"),
+        # Categorical map only visits the categories; unknown types fall back to a blank tile
+        emoji=timeline_df["event_type"].map(EVENT_EMOJI).astype(object).fillna("⬜"),
+        color=RISK_COLORS[classify_risk_codes(timeline_df["ai_risk_score"].to_numpy())],
+        mitre=timeline_df["mitre_technique"].map(mitre_badge),
+    )
+
+    rows = timeline_df[
+        ["ts", "emoji", "event_type", "file_path", "color", "ai_risk_score", "mitre"]
+    ].itertuples(index=False, name=None)
+    feed = "\n\n".join(
+        f"**{ts}** — {emoji} `{etype}` on `{fpath}` | "
+        f"Risk: <span style='color:{color};'>{score}</span>"
+        f" | {mitre}"
+        for ts, emoji, etype, fpath, color, score, mitre in rows
+    )
+    st.markdown(feed, unsafe_allow_html=True)
+
+
+with timeline_col:
+    live_feed()
+
+st.caption(
+    f"Showing up to the last {EVENT_BUFFER_LIMIT} events accumulated from the live /events API "
+    f"this session; KPIs and the live feed refresh every {LIVE_REFRESH_SECONDS}s."
+)
@@ -1,10 +1,18 @@
+import gzip
+import json
 import logging
-import queue
 import threading
-from typing import Any, Dict, Iterable, List, Optional
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+# Batches above this size are gzipped; event JSON is repetitive and compresses well
+GZIP_MIN_BYTES = 1024
+
+# Queued events are kept as (path, encoded JSON) so the sender only joins bytes
+EncodedEvent = Tuple[Any, bytes]
+
 
 class HackstoneClient:
     """HTTP client that batches and ships events to HackStone."""
@@ -26,7 +34,9 @@ class HackstoneClient:
         self.max_queue_size = max_queue_size
         self.session = session or requests.Session()
 
-        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        # deque(maxlen=...) drops the oldest event on overflow; one lock covers both ends
+        self._queue: "deque[EncodedEvent]" = deque(maxlen=max_queue_size if max_queue_size > 0 else None)
+        self._queue_lock = threading.Lock()
         self._stop_event = threading.Event()
         self._thread = threading.Thread(target=self._run, name="hackstone-sender", daemon=True)
 
@@ -49,13 +59,21 @@ class HackstoneClient:
         self._thread.join(timeout=timeout)
 
     def enqueue(self, event: Dict[str, Any]) -> None:
-        if self._queue.full():
-            try:
-                dropped = self._queue.get_nowait()
-                logging.warning("HackStone queue full (%s); dropping oldest event for %s", self.max_queue_size, dropped.get("path"))
-            except queue.Empty:
-                pass
-        self._queue.put_nowait(event)
+        # Encode on the producer side: the sender thread then only concatenates bytes,
+        # and a batch that fails to send is retried without being serialized again
+        try:
+            encoded = json.dumps(event, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        except (TypeError, ValueError) as exc:
+            logging.error("Dropping HackStone event for %s that cannot be encoded: %s", event.get("path"), exc)
+            return
+        self._append((event.get("path"), encoded))
+
+    def _append(self, item: EncodedEvent) -> None:
+        with self._queue_lock:
+            dropped = self._queue[0] if len(self._queue) == self._queue.maxlen else None
+            self._queue.append(item)
+        if dropped is not None:
+            logging.warning("HackStone queue full (%s); dropping oldest event for %s", self.max_queue_size, dropped[0])
 
     def _run(self) -> None:
         while not self._stop_event.is_set():
@@ -63,41 +81,41 @@ class HackstoneClient:
             self._stop_event.wait(self.send_interval_seconds)
         self._flush()
 
-    def _dequeue_batch(self) -> List[Dict[str, Any]]:
-        events: List[Dict[str, Any]] = []
-        while len(events) < self.batch_size:
-            try:
-                events.append(self._queue.get_nowait())
-            except queue.Empty:
-                break
-        return events
+    def _dequeue_batch(self) -> List[EncodedEvent]:
+        with self._queue_lock:
+            count = min(self.batch_size, len(self._queue))
+            popleft = self._queue.popleft
+            return [popleft() for _ in range(count)]
 
     def _flush(self) -> None:
         batch = self._dequeue_batch()
         if not batch:
             return
 
-        payload: Iterable[Dict[str, Any]] | Dict[str, Any]
         if len(batch) == 1:
-            payload = batch[0]
+            body = batch[0][1]
         else:
-            payload = batch
+            body = b"[" + b",".join(encoded for _, encoded in batch) + b"]"
 
         url = f"{self.base_url}{self.ingest_path}"
         try:
-            response = self.session.post(url, json=payload, timeout=10)
+            headers = {"Content-Type": "application/json"}
+            if len(body) > GZIP_MIN_BYTES:
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+            response = self.session.post(url, data=body, headers=headers, timeout=10)
             if response.status_code >= 200 and response.status_code < 300:
                 logging.info("Sent %s event(s) to HackStone", len(batch))
             else:
                 logging.error(
                     "Failed to send events to HackStone: status=%s body=%s", response.status_code, self._safe_body(response)
                 )
-                for evt in batch:
-                    self.enqueue(evt)
+                for item in batch:
+                    self._append(item)
         except Exception as exc:  # broad exception to keep agent alive
             logging.error("Error sending events to HackStone: %s", exc)
-            for evt in batch:
-                self.enqueue(evt)
+            for item in batch:
+                self._append(item)
 
     @staticmethod
     def _safe_body(response: requests.Response) -> str:
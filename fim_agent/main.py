@@ -38,18 +38,19 @@ def load_config(config_path: str | Path) -> AgentConfig:
     )
 
 
-def to_hackstone_event(local_event: Dict[str, Any], cfg: AgentConfig) -> Dict[str, Any]:
-    action_map = {
-        "created": "create",
-        "create": "create",
-        "modified": "modify",
-        "modify": "modify",
-        "deleted": "delete",
-        "delete": "delete",
-    }
+ACTION_MAP = {
+    "created": "create",
+    "create": "create",
+    "modified": "modify",
+    "modify": "modify",
+    "deleted": "delete",
+    "delete": "delete",
+}
 
+
+def to_hackstone_event(local_event: Dict[str, Any], cfg: AgentConfig) -> Dict[str, Any]:
     action = local_event.get("action") or local_event.get("event_type")
-    normalized_action = action_map.get(str(action).lower(), "modify")
+    normalized_action = ACTION_MAP.get(str(action).lower(), "modify")
 
     return {
         "agent_id": cfg.agent_id,
@@ -0,0 +1,262 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib JSON parsing is used without it
+    orjson = None
+
+API_URL = "http://127.0.0.1:8000/events?limit=100"
+# Upper bound on events kept in st.session_state between reruns
+EVENT_BUFFER_LIMIT = 500
+
+
+# =============================================================
+# Event loading
+# =============================================================
+@st.cache_resource
+def _session() -> requests.Session:
+    """Keep-alive HTTP session shared by every rerun and browser session."""
+    session = requests.Session()
+    # Every request goes to the one API host; a few pooled connections cover
+    # browser sessions polling at the same moment
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Just under the 3s live refresh so each fragment tick performs one real request
+@st.cache_data(ttl=2.5, show_spinner=False)
+def fetch_events(
+    cursor: str | None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> Tuple[pd.DataFrame | None, str | None, str | None]:
+    """Fetch events newer than ``cursor``; returns ``None`` when the API answers 304."""
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    params = {"since": cursor} if cursor else None
+    resp = _session().get(API_URL, params=params, headers=headers, timeout=2)
+    if resp.status_code == 304:
+        return None, etag, last_modified
+    resp.raise_for_status()
+    data = orjson.loads(resp.content) if orjson is not None else resp.json()
+    events = data.get("events", [])
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+
+    if not events:
+        return pd.DataFrame(), etag, last_modified
+
+    df = pd.DataFrame(events)
+
+    if "timestamp" in df.columns:
+        # Pinned to ns: the dashboard does its time arithmetic on the raw int64 values
+        df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.as_unit("ns")
+    if "process_name" in df.columns:
+        df = df.rename(columns={"process_name": "process"})
+    if "hash_before" in df.columns:
+        df = df.rename(columns={"hash_before": "old_hash"})
+    if "hash_after" in df.columns:
+        df = df.rename(columns={"hash_after": "new_hash"})
+
+    # Only the delta is sorted; the accumulated buffer stays in arrival order
+    df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+    return df, etag, last_modified
+
+
+def _append_events(cached: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Append rows newer than the buffer's tail, tolerating an API that ignores ``since``."""
+    if cached.empty:
+        return new.tail(EVENT_BUFFER_LIMIT)
+
+    last_ts = cached["timestamp"].iat[-1]
+    new = new[new["timestamp"] >= last_ts]
+    if "event_id" in new.columns and "event_id" in cached.columns:
+        seen = cached.loc[cached["timestamp"] == last_ts, "event_id"]
+        new = new[~new["event_id"].isin(seen)]
+    else:
+        new = new[new["timestamp"] > last_ts]
+
+    if new.empty:
+        return cached
+    return pd.concat([cached, new], ignore_index=True).tail(EVENT_BUFFER_LIMIT)
+
+
+def load_events_from_api() -> pd.DataFrame:
+    """Return the oldest-first event buffer kept in session state, topped up with new events."""
+    state = st.session_state
+    cached = state.get("events_df", pd.DataFrame())
+    try:
+        new_df, etag, last_modified = fetch_events(
+            state.get("events_cursor"),
+            state.get("events_etag"),
+            state.get("events_last_modified"),
+        )
+    except Exception as e:  # noqa: BLE001
+        st.error(f"API error: {e}")
+        return pd.DataFrame()
+
+    # 304 Not Modified: nothing newer than the cursor
+    if new_df is None:
+        return cached
+
+    state["events_etag"] = etag
+    state["events_last_modified"] = last_modified
+    if new_df.empty:
+        return cached
+
+    df = _append_events(cached, new_df)
+    state["events_df"] = df
+    state["events_cursor"] = df["timestamp"].iat[-1].isoformat()
+    return df
+
+
+# Normalize expected columns and fallbacks
+defaults: Dict[str, str | int] = {
+    "event_type": "unknown",
+    "file_path": "(unknown)",
+    "mitre_technique": "unknown",
+    "user": "unknown",
+    "process": "unknown",
+    "host": "unknown",
+    "site": "unknown",
+    "reason": "No description provided.",
+    "old_hash": "-",
+    "new_hash": "-",
+}
+
+# Low-cardinality columns stored as categoricals so filters compare integer codes
+CATEGORICAL_COLUMNS = ("event_type", "mitre_technique", "user", "process", "host", "site")
+# High-cardinality text columns kept in Arrow-backed string arrays
+ARROW_STRING_COLUMNS = ["file_path", "reason", "old_hash", "new_hash"]
+
+
+def normalize_events(df: pd.DataFrame) -> pd.DataFrame:
+    # The buffer is already in arrival order, so newest-first is a reversal rather than a sort
+    df = df.iloc[::-1].reset_index(drop=True)
+
+    missing = {col: default for col, default in defaults.items() if col not in df.columns}
+    df = df.assign(**missing).fillna(defaults)
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    df[ARROW_STRING_COLUMNS] = df[ARROW_STRING_COLUMNS].astype("string[pyarrow]")
+    # Hashes are near-unique per event, so rather than categorising them the "carries hash
+    # data" test is evaluated once here and every filtered view just indexes this flag
+    df["has_hash"] = ((df["old_hash"] != "-") | (df["new_hash"] != "-")).to_numpy(dtype=bool)
+
+    # Scores are bounded 0-100, so int8 holds them at an eighth of the int64 footprint.
+    # The API normally sends integers; only other payloads go through coercion.
+    score = df.get("ai_risk_score")
+    if score is None:
+        df["ai_risk_score"] = np.int8(0)
+    elif score.dtype.kind in "iu":
+        df["ai_risk_score"] = score.clip(0, 100).astype(np.int8)
+    else:
+        df["ai_risk_score"] = pd.to_numeric(score, errors="coerce").fillna(0).clip(0, 100).astype(np.int8)
+
+    if "event_id" not in df.columns:
+        df["event_id"] = np.char.mod("evt-%05d", np.arange(len(df)))
+
+    return df
+
+
+def load_normalized_events() -> pd.DataFrame:
+    """Return the normalized event buffer, re-normalizing only when new events arrived.
+
+    ``load_events_from_api`` hands back the same buffer object until it grows, so the
+    normalized frame is memoized in session state against that object.
+    """
+    raw = load_events_from_api()
+    if raw.empty:
+        return raw
+
+    state = st.session_state
+    memo = state.get("events_normalized")
+    if memo is not None and memo[0] is raw:
+        return memo[1]
+
+    df = normalize_events(raw)
+    state["events_normalized"] = (raw, df)
+    return df
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def facet_options(data_sig: tuple, _df: pd.DataFrame) -> Dict[str, list]:
+    """Sorted distinct values of each facet column, rebuilt only when ``data_sig`` changes.
+
+    normalize_events builds each categorical from the buffer itself, so its categories are
+    exactly the observed values, already sorted and free of NaN.
+    """
+    return {col: _df[col].cat.categories.tolist() for col in CATEGORICAL_COLUMNS}
+
+
+# =============================================================
+# Helper utilities
+# =============================================================
+SEVERITY_COLORS = {
+    "high": "#f77f00",
+    "medium": "#ffd166",
+    "low": "#4cc9f0",
+}
+
+EVENT_EMOJI = {
+    "create": "🟩",
+    "modify": "🟨",
+    "delete": "🟥",
+}
+
+
+def classify_risk(score: int) -> str:
+    if score >= 70:
+        return "high"
+    if score >= 40:
+        return "medium"
+    return "low"
+
+
+# Vectorized classify_risk: lower score bounds of "medium" and "high"
+RISK_BINS = np.array([40, 70])
+RISK_LABELS = np.array(["low", "medium", "high"])
+
+
+def classify_risk_codes(scores: np.ndarray) -> np.ndarray:
+    """Index into RISK_LABELS for each score."""
+    return np.searchsorted(RISK_BINS, scores, side="right").astype(np.int8)
+
+
+# Score at which an event counts towards the "High-risk" KPI
+HIGH_RISK_THRESHOLD = 80
+
+
+SEVERITY_BADGES = {
+    level: f"<span style='color:{color}; font-weight:600;'>{level.upper()}</span>"
+    for level, color in SEVERITY_COLORS.items()
+}
+
+
+def severity_badge(score: int) -> str:
+    return SEVERITY_BADGES[classify_risk(score)]
+
+
+# The technique set is small and repeats on every refresh, so each badge is built once
+@lru_cache(maxsize=256)
+def mitre_badge(technique: str) -> str:
+    return f"<span style='background:#111827;color:white;padding:2px 6px;border-radius:6px;font-size:12px;'>MITRE {technique}</span>"
+
+
+def format_timestamp(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%d %H:%M:%S")
@@ -3,6 +3,8 @@ const fs = require('fs');
 const path = require('path');
 const crypto = require('crypto');
 const os = require('os');
+const zlib = require('zlib');
+const { pipeline } = require('stream');
 
 const ROOT = path.resolve(__dirname, '..');
 const DEFAULT_WATCH_DIR = path.join(ROOT, 'watched');
@@ -17,6 +19,7 @@ const METADATA_RULES_FILE = path.join(CONFIG_DIR, 'metadata_rules.json');
 const LEGACY_BASELINE_FILE = path.join(DATA_DIR, 'baseline.json');
 const LOCAL_BASELINE_ID = 'local';
 const LOG_FILE = path.join(LOG_DIR, 'fim.log');
+const LOG_ROTATE_BYTES = Number(process.env.LOG_ROTATE_BYTES) || 64 * 1024 * 1024;
 const AGENTS_FILE = path.join(CONFIG_DIR, 'agents.json');
 
 const IGNORE_NAMES = new Set(['.DS_Store', 'baseline.json', 'fim.log']);
@@ -46,7 +49,9 @@ const IGNORE_RULES = [
 }));
 
 let baselines = new Map();
-let eventHistory = [];
+const baselineEntryCounts = new Map(); // baselineId -> number of entries
+const eventHistory = [];
+let eventHistoryVersion = 0;
 const sseClients = new Set();
 let agentRegistry = new Map();
 let watchPaths = [];
@@ -65,6 +70,8 @@ const SUPPRESSION_STALE_MS = 5 * 60 * 1000;
 const suppressionTracker = new Map();
 let metadataRules = [];
 const EVENT_BUFFER_LIMIT = 500;
+const WATCH_COALESCE_MS = 100;
+const pendingWatchEvents = new Map(); // absolute path -> { eventType }
 
 const DEFAULT_METADATA_RULES = [
   {
@@ -273,32 +280,85 @@ function isIgnored(filePath) {
   return false;
 }
 
-async function hashFile(filePath) {
+// Files stat'ed and hashed concurrently while building a baseline
+const HASH_CONCURRENCY = 16;
+// 1 MiB reads keep OpenSSL's SHA-256 fed with far fewer read() calls than the 64 KiB default
+const HASH_READ_CHUNK_BYTES = 1024 * 1024;
+
+async function hashFile(filePath, size = null) {
+  // Small files (most of a config tree) are read and digested in one call instead of
+  // paying for a read stream and its events per file
+  if (size !== null && size <= HASH_READ_CHUNK_BYTES) {
+    const data = await fs.promises.readFile(filePath);
+    return crypto.createHash('sha256').update(data).digest('hex');
+  }
   return new Promise((resolve, reject) => {
     const hash = crypto.createHash('sha256');
-    const stream = fs.createReadStream(filePath);
+    const stream = fs.createReadStream(filePath, { highWaterMark: HASH_READ_CHUNK_BYTES });
     stream.on('data', (chunk) => hash.update(chunk));
     stream.on('error', reject);
     stream.on('end', () => resolve(hash.digest('hex')));
   });
 }
 
-async function walk(dir, collector = {}, baselineId = LOCAL_BASELINE_ID) {
+// Coarsest mtime granularity we allow for (FAT records 2 s; ext3 and HFS+ 1 s)
+const MTIME_GRANULARITY_MS = 2000;
+
+// Recorded hash when stat is unchanged and mtime is a full tick older than the hash, else null
+function reusableBaselineHash(entry, metadata) {
+  if (!entry?.hash || !entry.metadata || !entry.updated_at || !metadata?.mtime) return null;
+  const known = entry.metadata;
+  if (known.size !== metadata.size || known.mtime !== metadata.mtime || known.ctime !== metadata.ctime) {
+    return null;
+  }
+  if (Date.parse(metadata.mtime) + MTIME_GRANULARITY_MS > Date.parse(entry.updated_at)) return null;
+  return entry.hash;
+}
+
+async function listFiles(dir, files = []) {
   const entries = await fs.promises.readdir(dir, { withFileTypes: true });
   for (const entry of entries) {
     const fullPath = path.join(dir, entry.name);
     // Skip ignored files before attempting to descend or hash
     if (isIgnored(fullPath)) continue;
     if (entry.isDirectory()) {
-      await walk(fullPath, collector);
+      await listFiles(fullPath, files);
     } else if (entry.isFile()) {
-      const rel = path.relative(ROOT, fullPath);
-      const hash = await hashFile(fullPath);
-      const { metadata } = await collectFilesystemMetadata(fullPath);
-      collector[rel] = { hash, updated_at: new Date().toISOString(), metadata };
-      setLastKnownMetadata(baselineId, rel, metadata);
+      files.push(fullPath);
     }
   }
+  return files;
+}
+
+async function baselineEntryFor(fullPath, known) {
+  const { metadata, regularFile } = await collectFilesystemMetadata(fullPath);
+  const reused = reusableBaselineHash(known, metadata);
+  if (reused) {
+    return { hash: reused, updated_at: known.updated_at, metadata };
+  }
+  const hash = await hashFile(fullPath, regularFile ? metadata.size : null);
+  return { hash, updated_at: new Date().toISOString(), metadata };
+}
+
+async function walk(dir, collector = {}, baselineId = LOCAL_BASELINE_ID, previous = {}) {
+  const files = await listFiles(dir);
+  const rels = files.map((fullPath) => path.relative(ROOT, fullPath));
+  const results = new Array(files.length);
+  // Keep several stat+hash jobs in flight so reads overlap instead of queueing one by one
+  let next = 0;
+  const worker = async () => {
+    while (next < files.length) {
+      const idx = next++;
+      results[idx] = await baselineEntryFor(files[idx], previous[rels[idx]]);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(HASH_CONCURRENCY, files.length) }, worker));
+
+  // Assigned in directory order so the saved baseline stays stable between rebuilds
+  rels.forEach((rel, idx) => {
+    collector[rel] = results[idx];
+    setLastKnownMetadata(baselineId, rel, results[idx].metadata);
+  });
   return collector;
 }
 
@@ -361,7 +421,7 @@ async function loadBaseline(baselineId = LOCAL_BASELINE_ID) {
     data = {};
   }
   const normalized = normalizeBaselineData(data);
-  baselines.set(baselineId, normalized);
+  setBaselineData(baselineId, normalized);
   for (const [rel, entry] of Object.entries(normalized)) {
     if (entry?.metadata) {
       setLastKnownMetadata(baselineId, rel, ensureMetadataObject(entry.metadata));
@@ -387,29 +447,68 @@ async function getBaseline(baselineId = LOCAL_BASELINE_ID) {
   return loadBaseline(baselineId);
 }
 
+// Entry counts are kept alongside each baseline and adjusted per event, so the size
+// reported on every /api/events request does not re-enumerate every baseline's keys
+function setBaselineData(baselineId, data) {
+  baselines.set(baselineId, data);
+  baselineEntryCounts.set(baselineId, Object.keys(data).length);
+}
+
 function totalBaselineEntries() {
   let total = 0;
-  for (const data of baselines.values()) {
-    total += Object.keys(data || {}).length;
+  for (const count of baselineEntryCounts.values()) {
+    total += count;
   }
   return total;
 }
 
-async function saveBaseline(baselineId = LOCAL_BASELINE_ID) {
+// Saves arriving during a write fold into one follow-up write of the latest data
+const baselineSaveState = new Map();
+
+async function writeBaselineFile(baselineId) {
   const data = baselines.get(baselineId) || {};
   const filePath = baselineFilePath(baselineId);
-  await fs.promises.writeFile(filePath, JSON.stringify(data, null, 2));
+  const tmpPath = `${filePath}.tmp`;
+  await fs.promises.writeFile(tmpPath, JSON.stringify(data));
+  await fs.promises.rename(tmpPath, filePath);
+}
+
+function saveBaseline(baselineId = LOCAL_BASELINE_ID) {
+  let state = baselineSaveState.get(baselineId);
+  if (!state) {
+    state = { writing: null, queued: null };
+    baselineSaveState.set(baselineId, state);
+  }
+  const startWrite = () => {
+    const write = writeBaselineFile(baselineId).finally(() => {
+      if (state.writing === write) state.writing = null;
+    });
+    state.writing = write;
+    return write;
+  };
+  if (state.queued) return state.queued;
+  if (state.writing) {
+    state.queued = state.writing
+      .catch(() => {})
+      .then(() => {
+        state.queued = null;
+        return startWrite();
+      });
+    return state.queued;
+  }
+  return startWrite();
 }
 
 async function rebuildBaseline() {
   const baselineId = LOCAL_BASELINE_ID;
   const rebuilt = {};
+  const previous = baselines.get(baselineId) || {};
   for (const dir of watchPaths) {
     if (fs.existsSync(dir)) {
-      await walk(dir, rebuilt, baselineId);
+      await walk(dir, rebuilt, baselineId, previous);
     }
   }
-  baselines.set(baselineId, rebuilt);
+  setBaselineData(baselineId, rebuilt);
   await saveBaseline(baselineId);
   logEvent({
     id: crypto.randomUUID(),
@@ -433,7 +532,7 @@ async function purgeIgnoredBaselineEntries(baselineId = LOCAL_BASELINE_ID) {
     }
   }
   if (changed) {
-    baselines.set(baselineId, data);
+    setBaselineData(baselineId, data);
     await saveBaseline(baselineId);
   }
 }
@@ -441,12 +540,15 @@ async function purgeIgnoredBaselineEntries(baselineId = LOCAL_BASELINE_ID) {
 async function updateBaselineFromEvent(baselineId, rel, kind, afterHash, metadata) {
   const now = new Date().toISOString();
   const data = await getBaseline(baselineId);
+  const existed = Object.hasOwn(data, rel);
+  let countDelta = 0;
 
   if (kind === 'delete') {
     if (metadata) {
       setLastKnownMetadata(baselineId, rel, ensureMetadataObject(metadata));
     }
     delete data[rel];
+    if (existed) countDelta = -1;
   } else if (afterHash) {
     const normalizedMeta = ensureMetadataObject(metadata);
     setLastKnownMetadata(baselineId, rel, normalizedMeta);
@@ -455,15 +557,77 @@ async function updateBaselineFromEvent(baselineId, rel, kind, afterHash, metadat
       metadata: normalizedMeta,
       updated_at: now
     };
+    if (!existed) countDelta = 1;
   }
 
   baselines.set(baselineId, data);
+  baselineEntryCounts.set(baselineId, (baselineEntryCounts.get(baselineId) || 0) + countDelta);
   await saveBaseline(baselineId);
 }
 
-function logEvent(evt) {
-  const line = JSON.stringify(evt);
-  fs.appendFile(LOG_FILE, line + '\n', () => {});
+// One append-mode stream for the process instead of an open/write/close per event
+let logStream = null;
+let logBytes = 0;
+
+function logWriter() {
+  if (!logStream) {
+    try {
+      logBytes = fs.statSync(LOG_FILE).size;
+    } catch (err) {
+      logBytes = 0;
+    }
+    logStream = fs.createWriteStream(LOG_FILE, { flags: 'a' });
+    logStream.on('error', (err) => {
+      console.error('Failed to write event log:', err.message);
+      logStream = null;
+    });
+  }
+  return logStream;
+}
+
+// Once the active log passes LOG_ROTATE_BYTES it is renamed to a timestamped segment and
+// gzipped in the background; the next event starts a fresh fim.log
+function rotateLog() {
+  const stream = logStream;
+  logStream = null;
+  const segment = path.join(LOG_DIR, `fim-${Date.now()}.log`);
+  try {
+    fs.renameSync(LOG_FILE, segment);
+  } catch (err) {
+    console.error('Failed to rotate event log:', err.message);
+    if (stream) stream.end();
+    return;
+  }
+  const compress = () => {
+    pipeline(fs.createReadStream(segment), zlib.createGzip(), fs.createWriteStream(`${segment}.gz`), (err) => {
+      if (err) {
+        console.error('Failed to compress log segment:', err.message);
+        return;
+      }
+      fs.unlink(segment, () => {});
+    });
+  };
+  // Writes still queued on the old stream land in the renamed segment before it is compressed
+  if (stream) {
+    stream.end(compress);
+  } else {
+    compress();
+  }
+}
+
+function logEvent(evt, line = JSON.stringify(evt)) {
+  if (logStream && logBytes >= LOG_ROTATE_BYTES) {
+    rotateLog();
+  }
+  const stream = logWriter();
+  // Lines logged during the same tick are corked and leave in a single writev
+  if (!stream.writableCorked) {
+    stream.cork();
+    process.nextTick(() => stream.uncork());
+  }
+  const entry = line + '\n';
+  logBytes += Buffer.byteLength(entry);
+  stream.write(entry);
 }
 
 function suppressionKey(evt) {
@@ -627,7 +791,10 @@ async function collectFilesystemMetadata(filePath) {
         mtime: normalizeTimestamp(stat.mtime),
         ctime: normalizeTimestamp(stat.ctime)
       },
-      found: true
+      found: true,
+      // lstat's size is the link text for symlinks, so only regular files may
+      // size-select the single-read hash path
+      regularFile: stat.isFile()
     };
   } catch (err) {
     return { metadata: emptyMetadata(), found: false };
@@ -914,19 +1081,81 @@ function pushEvent(evt) {
 function storeEventInHistory(evt, { skipLog = false, skipBroadcast = false } = {}) {
   const normalized = normalizeEventShape(evt);
   eventHistory.unshift(normalized);
+  eventHistoryVersion += 1;
   if (eventHistory.length > EVENT_BUFFER_LIMIT) {
-    eventHistory = eventHistory.slice(0, EVENT_BUFFER_LIMIT);
+    eventHistory.length = EVENT_BUFFER_LIMIT;
   }
+  if (skipLog && skipBroadcast) return;
+  // One serialization shared by the log line and the SSE frame
+  const json = JSON.stringify(normalized);
   if (!skipLog) {
-    logEvent(normalized);
+    logEvent(normalized, json);
   }
   if (!skipBroadcast) {
-    broadcast(normalized);
+    broadcast(normalized, json);
+  }
+}
+
+function parseEventsLimit(raw) {
+  const limit = Number.parseInt(raw, 10);
+  if (!Number.isFinite(limit) || limit <= 0) return EVENT_BUFFER_LIMIT;
+  return Math.min(limit, EVENT_BUFFER_LIMIT);
+}
+
+// Top-level event keys that `fields=` may project onto
+const EVENT_FIELDS = new Set([
+  'id', 'type', 'file', 'path', 'action', 'timestamp', 'beforeHash', 'afterHash', 'mitre',
+  'severity', 'message', 'aiAssessment', 'source', 'agentId', 'metadata', 'prevMetadata',
+  'user', 'uid', 'gid', 'mode', 'permissions', 'size', 'mtime', 'ctime', 'extra', 'tags',
+  'rule_matches', 'quarantine', 'is_summary', 'summary'
+]);
+
+function parseEventsFields(raw) {
+  if (!raw) return null;
+  const fields = [...new Set(raw.split(',').map((name) => name.trim()))]
+    .filter((name) => EVENT_FIELDS.has(name))
+    .sort();
+  return fields.length ? fields : null;
+}
+
+function projectEvent(evt, fields) {
+  const projected = {};
+  for (const name of fields) {
+    if (Object.hasOwn(evt, name)) projected[name] = evt[name];
+  }
+  return projected;
+}
+
+// Cached /api/events bodies keyed by history version and baseline size, which also form the ETag
+const EVENTS_ETAG_PREFIX = `${process.pid.toString(36)}${Date.now().toString(36)}`;
+// Cap on cached limit/fields variants per version; others are serialized per request
+const EVENTS_RESPONSE_CACHE_MAX = 32;
+let eventsResponseCache = { key: null, responses: new Map() }; // responses: limit[-fields] -> { body, etag }
+
+function eventsResponse(limit, fields = null) {
+  const baselineSize = totalBaselineEntries();
+  const key = `${eventHistoryVersion}-${baselineSize}`;
+  if (eventsResponseCache.key !== key) {
+    eventsResponseCache = { key, responses: new Map() };
+  }
+  const variant = fields ? `${limit}-${fields.join('.')}` : `${limit}`;
+  let response = eventsResponseCache.responses.get(variant);
+  if (response === undefined) {
+    let events = eventHistory.slice(0, limit);
+    if (fields) events = events.map((evt) => projectEvent(evt, fields));
+    response = {
+      body: JSON.stringify({ events, baselineSize }),
+      etag: `"${EVENTS_ETAG_PREFIX}-${key}-${variant}"`
+    };
+    if (eventsResponseCache.responses.size < EVENTS_RESPONSE_CACHE_MAX) {
+      eventsResponseCache.responses.set(variant, response);
+    }
   }
+  return response;
 }
 
-function broadcast(payload) {
-  const data = `data: ${JSON.stringify(payload)}\n\n`;
+function broadcast(payload, json = JSON.stringify(payload)) {
+  const data = `data: ${json}\n\n`;
   sseClients.forEach((res) => res.write(data));
 }
 
@@ -1088,20 +1317,19 @@ function buildTimeline(rangeParam = '24h') {
   const windowMs = TIMELINE_RANGE_MS[range];
   const windowStart = now - windowMs;
 
-  const windowEvents = eventHistory
-    .map((evt) => normalizeEventShape(evt))
-    .filter((evt) => {
-      const ts = eventTimestampMs(evt);
-      return ts !== null && ts >= windowStart;
-    });
+  // Each timestamp is parsed once and carried with its event, rather than re-parsed
+  // inside the sort comparator. History entries are already normalized on insert.
+  const sorted = [];
+  for (const evt of eventHistory) {
+    const ts = eventTimestampMs(evt);
+    if (ts !== null && ts >= windowStart) sorted.push({ evt, ts });
+  }
+  sorted.sort((a, b) => a.ts - b.ts);
 
-  const sorted = [...windowEvents].sort((a, b) => eventTimestampMs(a) - eventTimestampMs(b));
   const groups = [];
   let current = null;
 
-  for (const evt of sorted) {
-    const ts = eventTimestampMs(evt);
-    if (ts === null) continue;
+  for (const { evt, ts } of sorted) {
     const user = evt.user || evt.metadata?.user || '';
     const groupKey = `${evt.source || 'local'}|${evt.agentId || ''}|${user}|${evt.path || evt.file || ''}`;
 
@@ -1115,8 +1343,10 @@ function buildTimeline(rangeParam = '24h') {
   }
   if (current) groups.push(current);
 
-  const entries = groups.map((group, idx) => buildTimelineEntry(group, idx));
-  entries.sort((a, b) => new Date(b.end) - new Date(a.end));
+  const entries = groups
+    .map((group, idx) => ({ endTs: group.endTs, entry: buildTimelineEntry(group, idx) }))
+    .sort((a, b) => b.endTs - a.endTs)
+    .map(({ entry }) => entry);
 
   return {
     range,
@@ -1127,17 +1357,34 @@ function buildTimeline(rangeParam = '24h') {
 
 function parseJsonBody(req) {
   return new Promise((resolve, reject) => {
+    // Agents gzip larger batches; the size limit applies to the inflated body
+    const encoding = (req.headers['content-encoding'] || 'identity').toLowerCase();
+    let source = req;
+    if (encoding === 'gzip') {
+      source = req.pipe(zlib.createGunzip());
+      source.on('error', (err) => {
+        err.statusCode = 400;
+        reject(err);
+      });
+    } else if (encoding !== 'identity') {
+      const err = new Error(`Unsupported Content-Encoding: ${encoding}`);
+      err.statusCode = 415;
+      reject(err);
+      req.resume();
+      return;
+    }
     let body = '';
-    req.on('data', (chunk) => {
+    source.on('data', (chunk) => {
       body += chunk;
       if (body.length > MAX_BODY_SIZE) {
         const err = new Error('Payload too large');
         err.statusCode = 413;
         reject(err);
+        source.destroy();
         req.destroy();
       }
     });
-    req.on('end', () => {
+    source.on('end', () => {
       if (!body) {
         const err = new Error('Empty body');
         err.statusCode = 400;
@@ -1300,7 +1547,7 @@ function describeAgentIds(events) {
   return 'mixed';
 }
 
-async function handleChange(kind, filePath, baseDir) {
+async function handleChange(kind, filePath, baseDir, statResult = null) {
   if (!filePath) return;
   const relWithinBase = baseDir ? path.relative(baseDir, filePath) : path.relative(ROOT, filePath);
   if (relWithinBase.startsWith('..')) return;
@@ -1315,7 +1562,7 @@ async function handleChange(kind, filePath, baseDir) {
   let before = baselineEntry?.hash || null;
   let after = null;
 
-  const metadataResult = await collectFilesystemMetadata(filePath);
+  const metadataResult = statResult || (await collectFilesystemMetadata(filePath));
   let metadata = metadataResult.metadata;
 
   if (kind === 'delete') {
@@ -1326,8 +1573,13 @@ async function handleChange(kind, filePath, baseDir) {
     } else {
       metadata = ensureMetadataObject(metadata);
     }
-  } else if (fs.existsSync(filePath)) {
-    after = await hashFile(filePath);
+  } else if (metadataResult.found) {
+    try {
+      after = await hashFile(filePath, metadataResult.regularFile ? metadata.size : null);
+    } catch (err) {
+      // lstat also finds dangling symlinks and files removed since; treat those as absent
+      if (err.code !== 'ENOENT') throw err;
+    }
     metadata = ensureMetadataObject(metadata);
   } else {
     metadata = ensureMetadataObject(metadata);
@@ -1366,24 +1618,48 @@ function describeEvent(kind, relPath, before, after) {
   return base;
 }
 
+async function dispatchWatchEvent(eventType, target, dir) {
+  const rel = path.relative(ROOT, target);
+  const baselineData = await getBaseline(LOCAL_BASELINE_ID);
+  const baselineEntry = baselineData[rel];
+  if (eventType === 'rename') {
+    // The lstat that tells a create from a delete is handed on, so the path is stat'ed once
+    const statResult = await collectFilesystemMetadata(target);
+    if (statResult.found) {
+      await handleChange(baselineEntry ? 'modify' : 'create', target, dir, statResult);
+    } else {
+      await handleChange('delete', target, dir, statResult);
+    }
+  } else if (eventType === 'change') {
+    await handleChange('modify', target, dir);
+  }
+}
+
+// fs.watch reports a single save as several events (truncate, write, metadata), so
+// events for one path are coalesced briefly and handled once
+function scheduleWatchEvent(eventType, target, dir) {
+  const pending = pendingWatchEvents.get(target);
+  if (pending) {
+    // A rename (create/delete) outranks a content change within the same burst
+    if (eventType === 'rename') pending.eventType = 'rename';
+    return;
+  }
+  const entry = { eventType };
+  pendingWatchEvents.set(target, entry);
+  setTimeout(() => {
+    pendingWatchEvents.delete(target);
+    dispatchWatchEvent(entry.eventType, target, dir).catch((err) => {
+      console.error('Watcher error:', err.message);
+    });
+  }, WATCH_COALESCE_MS);
+}
+
 function setupWatcher() {
   try {
     for (const dir of watchPaths) {
-      const watcher = fs.watch(dir, { recursive: true }, async (eventType, filename) => {
+      const watcher = fs.watch(dir, { recursive: true }, (eventType, filename) => {
         if (!filename) return;
-        const target = path.join(dir, filename);
-        const rel = path.relative(ROOT, target);
-        const baselineData = await getBaseline(LOCAL_BASELINE_ID);
-        const baselineEntry = baselineData[rel];
-        if (eventType === 'rename') {
-          if (fs.existsSync(target)) {
-            await handleChange(baselineEntry ? 'modify' : 'create', target, dir);
-          } else {
-            await handleChange('delete', target, dir);
-          }
-        } else if (eventType === 'change') {
-          await handleChange('modify', target, dir);
-        }
+        scheduleWatchEvent(eventType, path.join(dir, filename), dir);
       });
       watcher.on('error', (err) => {
         console.error('Watcher error:', err.message);
@@ -1425,9 +1701,18 @@ function handleSSE(req, res) {
 async function requestHandler(req, res) {
   const url = new URL(req.url, `http://${req.headers.host}`);
   if (url.pathname === '/api/events' && req.method === 'GET') {
-    res.writeHead(200, { 'Content-Type': 'application/json' });
-    const events = eventHistory.map(normalizeEventShape);
-    res.end(JSON.stringify({ events, baselineSize: totalBaselineEntries() }));
+    const { body, etag } = eventsResponse(
+      parseEventsLimit(url.searchParams.get('limit')),
+      parseEventsFields(url.searchParams.get('fields'))
+    );
+    // Pollers that already hold this version get an empty 304 instead of the full list
+    if (req.headers['if-none-match'] === etag) {
+      res.writeHead(304, { ETag: etag, 'Cache-Control': 'no-cache' });
+      res.end();
+      return;
+    }
+    res.writeHead(200, { 'Content-Type': 'application/json', ETag: etag, 'Cache-Control': 'no-cache' });
+    res.end(body);
     return;
   }
 
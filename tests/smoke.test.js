@@ -1,11 +1,14 @@
 const { test, before, after } = require('node:test');
 const assert = require('node:assert');
 const { spawn } = require('node:child_process');
+const fs = require('node:fs');
 const path = require('node:path');
+const zlib = require('node:zlib');
 
 const PORT = 3100;
 const BASE_URL = `http://localhost:${PORT}`;
 const ROOT = path.resolve(__dirname, '..');
+const SMOKE_AGENT_ID = 'smoke-test-agent';
 
 let serverProcess;
 
@@ -42,12 +45,26 @@ before(async () => {
   });
 
   await waitForServerReady(serverProcess);
+
+  // Seed the history so limit and projection assertions have events to act on
+  const timestamp = new Date().toISOString();
+  const response = await fetch(`${BASE_URL}/api/agent/events`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify([
+      { agent_id: SMOKE_AGENT_ID, path: '/srv/app/seed-a.conf', action: 'create', timestamp, hash: 'b'.repeat(64) },
+      { agent_id: SMOKE_AGENT_ID, path: '/srv/app/seed-b.conf', action: 'create', timestamp, hash: 'c'.repeat(64) }
+    ])
+  });
+  assert.strictEqual(response.status, 200);
+  await response.arrayBuffer();
 });
 
 after(() => {
   if (serverProcess && !serverProcess.killed) {
     serverProcess.kill('SIGTERM');
   }
+  fs.rmSync(path.join(ROOT, 'data', 'baseline', `${SMOKE_AGENT_ID}.json`), { force: true });
 });
 
 test('GET /api/events responds with event list and baseline size', async () => {
@@ -58,6 +75,81 @@ test('GET /api/events responds with event list and baseline size', async () => {
   assert.strictEqual(typeof data.baselineSize, 'number', 'baselineSize should be numeric');
 });
 
+test('GET /api/events honours the limit parameter', async () => {
+  const response = await fetch(`${BASE_URL}/api/events?limit=1`);
+  assert.strictEqual(response.status, 200);
+  const data = await response.json();
+  assert.ok(Array.isArray(data.events), 'events should be an array');
+  assert.strictEqual(data.events.length, 1, 'exactly one of the seeded events should be returned');
+});
+
+test('GET /api/events projects events onto the requested fields', async () => {
+  const response = await fetch(`${BASE_URL}/api/events?fields=timestamp,type`);
+  assert.strictEqual(response.status, 200);
+  const data = await response.json();
+  assert.strictEqual(typeof data.baselineSize, 'number', 'baselineSize should be numeric');
+  assert.ok(data.events.length >= 2, 'seeded events should be returned');
+  for (const evt of data.events) {
+    assert.deepStrictEqual(Object.keys(evt).sort(), ['timestamp', 'type']);
+  }
+});
+
+test('GET /api/events ignores unknown projection fields', async () => {
+  const projected = await fetch(`${BASE_URL}/api/events?fields=type,notAField`);
+  const plain = await fetch(`${BASE_URL}/api/events?fields=type`);
+  assert.strictEqual(projected.headers.get('etag'), plain.headers.get('etag'));
+  const data = await projected.json();
+  await plain.arrayBuffer();
+  assert.ok(data.events.length >= 2, 'seeded events should be returned');
+  for (const evt of data.events) {
+    assert.deepStrictEqual(Object.keys(evt), ['type']);
+  }
+
+  const unknownOnly = await fetch(`${BASE_URL}/api/events?fields=notAField`);
+  const full = await fetch(`${BASE_URL}/api/events`);
+  assert.strictEqual(unknownOnly.headers.get('etag'), full.headers.get('etag'));
+  await unknownOnly.arrayBuffer();
+  await full.arrayBuffer();
+});
+
+test('GET /api/events answers 304 for a matching ETag', async () => {
+  const first = await fetch(`${BASE_URL}/api/events`);
+  const etag = first.headers.get('etag');
+  assert.ok(etag, 'ETag header should be present');
+  await first.arrayBuffer();
+
+  const second = await fetch(`${BASE_URL}/api/events`, { headers: { 'If-None-Match': etag } });
+  assert.strictEqual(second.status, 304);
+});
+
+test('POST /api/agent/events accepts a gzipped body', async () => {
+  const event = {
+    agent_id: SMOKE_AGENT_ID,
+    path: '/srv/app/config.yml',
+    action: 'modify',
+    timestamp: new Date().toISOString(),
+    hash: 'a'.repeat(64)
+  };
+  const response = await fetch(`${BASE_URL}/api/agent/events`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+    body: zlib.gzipSync(JSON.stringify(event))
+  });
+  assert.strictEqual(response.status, 200);
+  const data = await response.json();
+  assert.strictEqual(data.ok, true);
+});
+
+test('POST /api/agent/events rejects unsupported content encodings', async () => {
+  const response = await fetch(`${BASE_URL}/api/agent/events`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'br' },
+    body: '{}'
+  });
+  assert.strictEqual(response.status, 415);
+  await response.arrayBuffer();
+});
+
 test('GET /api/config exposes watch directory and governance filter', async () => {
   const response = await fetch(`${BASE_URL}/api/config`);
   assert.strictEqual(response.status, 200);